@@ -0,0 +1,27 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from azure.ai.projects.models import PromptAgentDefinition
+
+from transport import close_shared_transport, get_project_client, pool_stats
+
+# Variante asíncrona de agent.py sobre el transporte HTTP compartido (pool de conexiones)
+load_dotenv()
+
+async def main() -> None:
+    project_client = get_project_client()
+    try:
+        agent = await project_client.agents.create_version(
+            agent_name="R2D2",
+            definition=PromptAgentDefinition(
+                model=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"],
+                instructions="You are a helpful assistant that answers general questions",
+            ),
+        )
+        print(f"Agent created (id: {agent.id}, name: {agent.name}, version: {agent.version})")
+        print(f"[POOL] {pool_stats()}")
+    finally:
+        await close_shared_transport()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,20 +1,30 @@
 import os
+from typing import Optional
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from agent_framework.azure import AzureAIClient
-from azure.identity.aio import AzureCliCredential, DefaultAzureCredential
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from deadline import Deadline, deadline_scope
+from router import RouterStats, ejecutar_con_ruteo
+from transport import close_shared_transport, get_azure_ai_client, pool_stats
+
 # Cargar variables de entorno
 load_dotenv()
 
 app = FastAPI(title="Agente Financiero API")
 
+# Estadísticas del router para las consultas de /ask
+ROUTER_STATS = RouterStats()
+
 class QueryRequest(BaseModel):
     query: str
+    # Presupuesto de la solicitud en segundos (por defecto REQUEST_TIMEOUT_S, tope REQUEST_MAX_TIMEOUT_S)
+    timeout_s: Optional[float] = Field(default=None, gt=0)
 
 @app.post("/ask")
 async def ask_agent(request: QueryRequest):
+    # El deadline se fija al recibir la solicitud y acota todo el trabajo posterior.
+    deadline = Deadline.from_timeout(request.timeout_s)
     try:
         # Configuración de la herramienta de búsqueda
         search_tool_definition = {
@@ -43,21 +53,59 @@ async def ask_agent(request: QueryRequest):
         4. Contexto: Al responder sobre trimestres (Q3), verifica siempre el año fiscal en el documento fuente.
         """
 
-        # Usar DefaultAzureCredential para soportar tanto desarrollo local (CLI) como producción (Managed Identity)
-        async with DefaultAzureCredential() as credential:
-            async with AzureAIClient(async_credential=credential).create_agent(
+        chunks: list[str] = []
+
+        async def _responder(deployment: str) -> str:
+            chunks.clear()
+            # Cliente de proyecto compartido (DefaultAzureCredential + pool de conexiones del proceso):
+            # evita pagar TCP + TLS en cada request.
+            async with get_azure_ai_client().create_agent(
                 name="AgenteFinancieroTecpetrol", 
-                model=os.environ.get("AZURE_AI_MODEL_DEPLOYMENT_NAME", "gpt-4o"),
+                model=deployment,
                 instructions=financial_persona,
                 tools=search_tool_definition,
             ) as agent:
-                
-                result = await agent.run(request.query)
-                return {"response": str(result)}
+                async for chunk in agent.run_stream(request.query):
+                    if chunk.text:
+                        chunks.append(chunk.text)
+            return "".join(chunks)
+
+        async def _ejecutar(deployment: str):
+            return await deadline.run_stage(f"agente[{deployment}]", _responder(deployment))
+
+        # El router elige el deployment (rápido o grande) y escala si la respuesta no trae citas
+        with deadline_scope(deadline):
+            result, decision = await ejecutar_con_ruteo(request.query, _ejecutar, stats=ROUTER_STATS)
+
+        # Si se agotó el tiempo devolvemos lo generado hasta ese momento
+        partial = result is None
+        return {
+            "response": "".join(chunks) if partial else result,
+            "partial": partial,
+            "routing": {
+                "tier": decision.tier,
+                "deployment": decision.deployment,
+                "reason": decision.reason,
+                "escalated": decision.escalated,
+            },
+            "trace": deadline.summary(),
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/router/stats")
+async def router_stats():
+    return ROUTER_STATS.summary()
+
+@app.get("/transport/stats")
+async def transport_stats():
+    return pool_stats()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_shared_transport()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
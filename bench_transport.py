@@ -0,0 +1,178 @@
+"""
+Benchmark del transporte compartido contra un servidor TLS local (sin Azure).
+
+Compara, para el camino del SDK de Azure (aiohttp) y el del cliente OpenAI (httpx):
+- "por_llamada": un cliente/pool nuevo en cada llamada (comportamiento anterior).
+- "compartido":  el pool único de `transport.SharedTransport`.
+
+Uso:  python bench_transport.py --llamadas 200
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import aiohttp
+import httpx
+from aiohttp import web
+from azure.core import AsyncPipelineClient
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.core.rest import HttpRequest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from transport import PoolStats, SharedTransport
+
+# =============================================================================
+# SERVIDOR TLS LOCAL (stand-in de los endpoints de Azure)
+# =============================================================================
+
+def _generar_certificado(directorio: str) -> tuple:
+    """Certificado autofirmado para 127.0.0.1/localhost."""
+    clave = ec.generate_private_key(ec.SECP256R1())
+    nombre = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    ahora = datetime.datetime.now(datetime.timezone.utc)
+    certificado = (
+        x509.CertificateBuilder()
+        .subject_name(nombre)
+        .issuer_name(nombre)
+        .public_key(clave.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(ahora - datetime.timedelta(minutes=1))
+        .not_valid_after(ahora + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(clave, hashes.SHA256())
+    )
+    ruta_cert = os.path.join(directorio, "cert.pem")
+    ruta_clave = os.path.join(directorio, "key.pem")
+    with open(ruta_cert, "wb") as f:
+        f.write(certificado.public_bytes(serialization.Encoding.PEM))
+    with open(ruta_clave, "wb") as f:
+        f.write(clave.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return ruta_cert, ruta_clave
+
+
+async def _iniciar_servidor(ruta_cert: str, ruta_clave: str) -> tuple:
+    async def _responder(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    aplicacion = web.Application()
+    aplicacion.router.add_get("/ping", _responder)
+    runner = web.AppRunner(aplicacion)
+    await runner.setup()
+
+    contexto = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    contexto.load_cert_chain(ruta_cert, ruta_clave)
+    sitio = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=contexto)
+    await sitio.start()
+    puerto = runner.addresses[0][1]
+    return runner, f"https://127.0.0.1:{puerto}"
+
+# =============================================================================
+# ESCENARIOS
+# =============================================================================
+
+async def _azure_por_llamada(url: str, ssl_cliente: ssl.SSLContext, stats: PoolStats) -> None:
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=ssl_cliente),
+        trace_configs=[stats.aiohttp_trace_config()],
+    )
+    async with AsyncPipelineClient(url, transport=AioHttpTransport(session=session, session_owner=True)) as client:
+        respuesta = await client.send_request(HttpRequest("GET", f"{url}/ping"))
+        await respuesta.read()
+
+
+def _azure_compartido(compartido: SharedTransport) -> Callable[[str, ssl.SSLContext, PoolStats], Awaitable[None]]:
+    async def _llamar(url: str, ssl_cliente: ssl.SSLContext, stats: PoolStats) -> None:
+        # El cliente del SDK se crea por llamada (como antes), pero el pool es compartido
+        async with AsyncPipelineClient(url, transport=compartido.azure_transport()) as client:
+            respuesta = await client.send_request(HttpRequest("GET", f"{url}/ping"))
+            await respuesta.read()
+    return _llamar
+
+
+async def _openai_por_llamada(url: str, ssl_cliente: ssl.SSLContext, stats: PoolStats) -> None:
+    async with httpx.AsyncClient(verify=ssl_cliente, event_hooks=stats.httpx_event_hooks()) as client:
+        respuesta = await client.get(f"{url}/ping")
+        respuesta.raise_for_status()
+
+
+def _openai_compartido(compartido: SharedTransport) -> Callable[[str, ssl.SSLContext, PoolStats], Awaitable[None]]:
+    async def _llamar(url: str, ssl_cliente: ssl.SSLContext, stats: PoolStats) -> None:
+        respuesta = await compartido.http_client.get(f"{url}/ping")
+        respuesta.raise_for_status()
+    return _llamar
+
+
+async def _medir(
+    llamar: Callable[[str, ssl.SSLContext, PoolStats], Awaitable[None]],
+    url: str,
+    ssl_cliente: ssl.SSLContext,
+    stats: PoolStats,
+    llamadas: int,
+) -> Dict[str, float]:
+    latencias: List[float] = []
+    for _ in range(llamadas):
+        inicio = time.perf_counter()
+        await llamar(url, ssl_cliente, stats)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    latencias.sort()
+    return {
+        "p50_ms": round(statistics.median(latencias), 3),
+        "p99_ms": round(latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))], 3),
+        "media_ms": round(statistics.mean(latencias), 3),
+        **stats.summary(),
+    }
+
+
+async def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del pool HTTP compartido contra un servidor TLS local.")
+    parser.add_argument("--llamadas", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_cert, ruta_clave = _generar_certificado(directorio)
+        runner, url = await _iniciar_servidor(ruta_cert, ruta_clave)
+        ssl_cliente = ssl.create_default_context(cafile=ruta_cert)
+
+        try:
+            async with SharedTransport(ssl_context=ssl_cliente) as compartido:
+                escenarios = {
+                    "azure_sdk/por_llamada": (_azure_por_llamada, PoolStats()),
+                    "azure_sdk/compartido": (_azure_compartido(compartido), compartido.azure_stats),
+                    "openai/por_llamada": (_openai_por_llamada, PoolStats()),
+                    "openai/compartido": (_openai_compartido(compartido), compartido.openai_stats),
+                }
+                resultados = {}
+                for nombre, (llamar, stats) in escenarios.items():
+                    resultados[nombre] = await _medir(llamar, url, ssl_cliente, stats, args.llamadas)
+                    print(f"[BENCH] {nombre}: {resultados[nombre]}")
+        finally:
+            await runner.cleanup()
+
+    for camino in ("azure_sdk", "openai"):
+        antes = resultados[f"{camino}/por_llamada"]["media_ms"]
+        despues = resultados[f"{camino}/compartido"]["media_ms"]
+        print(f"[BENCH] {camino}: {antes:.2f} ms -> {despues:.2f} ms por llamada ({(1 - despues / antes) * 100:.0f}% menos)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
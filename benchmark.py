@@ -0,0 +1,332 @@
+"""
+Benchmark de overhead del framework usando cassettes (sin red, sin modelos en vivo).
+
+Reproduce las cassettes grabadas de cada workflow y mide el tiempo que NO es del modelo:
+manejo de eventos, hand-offs entre agentes e I/O de checkpoints. Compara contra una línea
+base y termina con código 1 si algún workflow empeora más allá de la tolerancia (código 2 si
+falta la línea base o la cassette de un workflow pedido con --workflow).
+
+El workflow `sintetico` no necesita Azure: graba en cada corrida una cassette con un cliente
+de chat guionado y una tool `@grabar_tool`, y la reproduce con `ReplayChatClient`. Así el
+gate de regresión se puede ejecutar en CI sin cassettes grabadas contra modelos reales.
+
+Uso:
+  1. Grabar:      CASSETTE_MODE=record python sequencial.py   (idem multiagent.py, chat_grupo.py)
+  2. Línea base:  python benchmark.py --update-baseline
+  3. Comparar:    python benchmark.py
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from agent_framework import (
+    BaseChatClient,
+    ChatAgent,
+    ChatMessage,
+    ChatResponse,
+    ChatResponseUpdate,
+    FileCheckpointStorage,
+    FunctionCallContent,
+    TextContent,
+    use_function_invocation,
+)
+from dotenv import load_dotenv
+
+import chat_grupo
+import multiagent
+import sequencial
+from cassette import (
+    CASSETTE_DIR,
+    MODO_RECORD,
+    VELOCIDAD_GRABADA,
+    VELOCIDAD_MAXIMA,
+    Cassette,
+    cassette_scope,
+    grabar_tool,
+)
+from deadline import Deadline
+
+load_dotenv()
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+# Métricas que se comparan contra la línea base
+METRICAS_REGRESION = ("overhead_s", "checkpoint_io_s")
+
+# =============================================================================
+# INSTRUMENTACIÓN
+# =============================================================================
+
+class CheckpointStorageCronometrado:
+    """Proxy de un CheckpointStorage que acumula el tiempo de I/O de cada llamada."""
+
+    def __init__(self, inner: Any):
+        self._inner = inner
+        self.io_s = 0.0
+        self.operaciones = 0
+
+    def __getattr__(self, nombre: str) -> Any:
+        atributo = getattr(self._inner, nombre)
+        if not asyncio.iscoroutinefunction(atributo):
+            return atributo
+
+        async def _cronometrado(*args: Any, **kwargs: Any) -> Any:
+            inicio = time.perf_counter()
+            try:
+                return await atributo(*args, **kwargs)
+            finally:
+                self.io_s += time.perf_counter() - inicio
+                self.operaciones += 1
+
+        return _cronometrado
+
+
+class ContadorEventos:
+    """Cuenta eventos y hand-offs (cambios de agente emisor) de un stream."""
+
+    def __init__(self):
+        self.eventos = 0
+        self.handoffs = 0
+        self._emisor_actual = None
+
+    def registrar(self, event: Any) -> None:
+        self.eventos += 1
+        emisor = getattr(event, "executor_id", None) or getattr(event, "author_name", None)
+        if emisor is None:
+            return
+        if self._emisor_actual is not None and emisor != self._emisor_actual:
+            self.handoffs += 1
+        self._emisor_actual = emisor
+
+# =============================================================================
+# WORKFLOW SINTÉTICO (Sin Azure)
+# =============================================================================
+
+CONSULTA_SINTETICA = "¿Cuál fue el EBITDA del Q3 2025?"
+
+
+@grabar_tool
+async def consultar_sintetico(tema: str) -> str:
+    """Tool de prueba: devuelve un dato citado, como el Agente Extractor."""
+    return f"{tema}: $420 M [doc_1†Reporte_Q3_2025.pdf]"
+
+
+@use_function_invocation
+class ChatClientGuionado(BaseChatClient):
+    """Cliente de chat local con respuestas fijas: primero pide la tool, luego responde citando."""
+
+    OTEL_PROVIDER_NAME = "guionado"
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._turno = 0
+
+    def _siguiente_respuesta(self) -> ChatResponse:
+        self._turno += 1
+        if self._turno == 1:
+            contenido = FunctionCallContent(call_id="call_1", name="consultar_sintetico", arguments={"tema": "EBITDA Q3 2025"})
+            return ChatResponse(messages=ChatMessage(role="assistant", contents=[contenido]))
+        return ChatResponse(messages=ChatMessage(role="assistant", text="El EBITDA del Q3 2025 fue $420 M [doc_1†Reporte_Q3_2025.pdf]."))
+
+    async def _inner_get_response(self, *, messages, **kwargs) -> ChatResponse:
+        return self._siguiente_respuesta()
+
+    async def _inner_get_streaming_response(self, *, messages, **kwargs):
+        respuesta = self._siguiente_respuesta()
+        for contenido in respuesta.messages[0].contents:
+            if isinstance(contenido, TextContent):
+                # El texto llega en varios chunks, como en un stream real
+                for palabra in contenido.text.split(" "):
+                    yield ChatResponseUpdate(role="assistant", contents=[TextContent(text=palabra + " ")])
+            else:
+                yield ChatResponseUpdate(role="assistant", contents=[contenido])
+
+
+def _agente_sintetico(chat_client: Any) -> ChatAgent:
+    return ChatAgent(
+        name="Sintetico",
+        chat_client=chat_client,
+        instructions="Responde usando `consultar_sintetico` y cita las fuentes.",
+        tools=[consultar_sintetico],
+    )
+
+
+async def grabar_cassette_sintetica(directorio: str) -> None:
+    """Graba la cassette `sintetico` (modelo guionado + tool) en `directorio`."""
+    cassette = Cassette("sintetico", MODO_RECORD, directorio=directorio)
+    agente = _agente_sintetico(cassette.grabar(ChatClientGuionado()))
+    with cassette_scope(cassette):
+        async for _ in agente.run_stream(CONSULTA_SINTETICA):
+            pass
+    cassette.guardar()
+
+# =============================================================================
+# WORKFLOWS
+# =============================================================================
+
+async def _bench_sintetico(cassette: Cassette, contador: ContadorEventos, _ckpt_dir: str) -> float:
+    async for update in _agente_sintetico(cassette.replay_client()).run_stream(CONSULTA_SINTETICA):
+        contador.registrar(update)
+    contador.handoffs += cassette.metricas["llamadas_tools"]
+    return 0.0
+
+
+async def _bench_multiagent(cassette: Cassette, contador: ContadorEventos, _ckpt_dir: str) -> float:
+    # Mismo camino que multiagent.main(): deadline, etapas, ruteo del Extractor y respuesta parcial
+    await multiagent.ejecutar_orquestador(
+        multiagent.USER_QUERY,
+        Deadline.from_timeout(),
+        al_actualizar=contador.registrar,
+    )
+    # Las llamadas reproducidas a agentes trabajadores (incluidos los escalamientos) son los hand-offs
+    contador.handoffs += cassette.metricas["llamadas_tools"]
+    return 0.0
+
+
+async def _bench_sequencial(cassette: Cassette, contador: ContadorEventos, _ckpt_dir: str) -> float:
+    workflow = sequencial.construir_workflow(cassette.replay_client())
+    async for event in workflow.run_stream(sequencial.USER_QUERY):
+        contador.registrar(event)
+    return 0.0
+
+
+async def _bench_chat_grupo(cassette: Cassette, contador: ContadorEventos, ckpt_dir: str) -> float:
+    storage = CheckpointStorageCronometrado(FileCheckpointStorage(storage_path=ckpt_dir))
+    workflow = chat_grupo.construir_workflow(cassette.replay_client(), storage)
+    async for event in workflow.run_stream(chat_grupo.TASK_INPUT):
+        contador.registrar(event)
+    return storage.io_s
+
+
+WORKFLOWS: Dict[str, Callable[[Cassette, ContadorEventos, str], Awaitable[float]]] = {
+    "sintetico": _bench_sintetico,
+    "multiagent": _bench_multiagent,
+    "sequencial": _bench_sequencial,
+    "chat_grupo": _bench_chat_grupo,
+}
+
+# =============================================================================
+# MEDICIÓN
+# =============================================================================
+
+async def medir_una_vez(nombre: str, velocidad: str, directorio: str) -> Dict[str, float]:
+    cassette = Cassette.cargar(nombre, velocidad, directorio)
+    contador = ContadorEventos()
+    # Los logs de los workflows (p. ej. escalamientos del router) no se escriben en la terminal:
+    # el I/O de stdout no debe contar como overhead ni depender de adónde va la salida.
+    with tempfile.TemporaryDirectory() as ckpt_dir, cassette_scope(cassette), contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        checkpoint_io_s = await WORKFLOWS[nombre](cassette, contador, ckpt_dir)
+        total_s = time.perf_counter() - inicio
+
+    # Lo que no es modelo ni tool reproducida es overhead del framework
+    overhead_s = total_s - cassette.metricas["modelo_s"] - cassette.metricas["tools_s"]
+    return {
+        "total_s": total_s,
+        "overhead_s": overhead_s,
+        "checkpoint_io_s": checkpoint_io_s,
+        "eventos": contador.eventos,
+        "handoffs": contador.handoffs,
+        "overhead_por_evento_ms": 1000 * overhead_s / contador.eventos if contador.eventos else 0.0,
+        "desajustes_cassette": cassette.desajustes,
+    }
+
+
+async def medir(nombre: str, repeticiones: int, velocidad: str, directorio: str = CASSETTE_DIR) -> Dict[str, float]:
+    """Mediana de `repeticiones` corridas (más una de calentamiento descartada)."""
+    await medir_una_vez(nombre, velocidad, directorio)
+    corridas = [await medir_una_vez(nombre, velocidad, directorio) for _ in range(repeticiones)]
+    return {
+        clave: round(statistics.median(c[clave] for c in corridas), 6)
+        for clave in corridas[0]
+    }
+
+
+def detectar_regresiones(
+    resultados: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerancia: float,
+    min_delta_s: float,
+) -> List[str]:
+    regresiones = []
+    for nombre, metricas in resultados.items():
+        base = baseline.get(nombre)
+        if base is None:
+            continue
+        for clave in METRICAS_REGRESION:
+            actual, referencia = metricas[clave], base.get(clave, 0.0)
+            # El delta mínimo absoluto evita falsos positivos por ruido en tiempos muy chicos
+            if actual > referencia * (1 + tolerancia) and actual - referencia > min_delta_s:
+                regresiones.append(
+                    f"{nombre}.{clave}: {actual * 1000:.2f} ms vs línea base {referencia * 1000:.2f} ms "
+                    f"(+{(actual / referencia - 1) * 100 if referencia else float('inf'):.0f}%)"
+                )
+    return regresiones
+
+
+async def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de overhead de orquestación con cassettes.")
+    parser.add_argument("--workflow", choices=sorted(WORKFLOWS), action="append", help="Workflows a medir (por defecto todos).")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--velocidad", choices=[VELOCIDAD_MAXIMA, VELOCIDAD_GRABADA], default=VELOCIDAD_MAXIMA)
+    parser.add_argument("--tolerancia", type=float, default=0.20, help="Empeoramiento relativo permitido (0.20 = 20%%).")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    resultados: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as dir_sintetico:
+        # La cassette sintética se regraba en cada corrida: siempre hay al menos un workflow medible
+        await grabar_cassette_sintetica(dir_sintetico)
+
+        for nombre in args.workflow or sorted(WORKFLOWS):
+            directorio = dir_sintetico if nombre == "sintetico" else CASSETTE_DIR
+            if not os.path.exists(os.path.join(directorio, f"{nombre}.json.gz")):
+                mensaje = f"[BENCH] {nombre}: sin cassette en '{directorio}' (grabar con CASSETTE_MODE=record)."
+                if args.workflow:
+                    # Se pidió explícitamente: no medirlo no puede pasar como éxito
+                    print(mensaje)
+                    return 2
+                print(f"{mensaje} Omitido.")
+                continue
+            resultados[nombre] = await medir(nombre, args.repeticiones, args.velocidad, directorio)
+            print(f"[BENCH] {nombre}: {json.dumps(resultados[nombre])}")
+            if resultados[nombre]["desajustes_cassette"]:
+                print(f"[BENCH] {nombre}: el workflow difiere de la grabación; conviene volver a grabar la cassette.")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, sort_keys=True)
+        print(f"[BENCH] Línea base actualizada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"[BENCH] No hay línea base en {args.baseline}; ejecutar con --update-baseline.")
+        return 2
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    sin_linea_base = sorted(set(resultados) - set(baseline))
+    if sin_linea_base:
+        print(f"[BENCH] Workflows sin línea base: {sin_linea_base}; ejecutar con --update-baseline.")
+        return 2
+    regresiones = detectar_regresiones(resultados, baseline, args.tolerancia, args.min_delta_ms / 1000)
+    for regresion in regresiones:
+        print(f"[REGRESIÓN] {regresion}")
+    if not regresiones:
+        print("[BENCH] Sin regresiones respecto de la línea base.")
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
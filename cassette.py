@@ -0,0 +1,274 @@
+"""
+Cassettes de grabación/reproducción para orquestaciones deterministas.
+
+- Modo `record`: se intercepta cada llamada al modelo (request, respuesta, chunks de streaming
+  con su tiempo relativo) y cada llamada a una tool envuelta con `@grabar_tool`, y se guarda
+  todo en un archivo comprimido `cassettes/<workflow>.json.gz`.
+- Modo `replay`: `ReplayChatClient` reemplaza al cliente real y devuelve las interacciones
+  grabadas, sin red, a velocidad grabada (`recorded`) o lo más rápido posible (`fast`).
+
+Variables de entorno (para los scripts CLI):
+  CASSETTE_MODE=off|record|replay   CASSETTE_SPEED=recorded|fast   CASSETTE_DIR=cassettes
+"""
+
+import asyncio
+import contextvars
+import functools
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from agent_framework import BaseChatClient, ChatResponse, ChatResponseUpdate, use_function_invocation
+
+CASSETTE_VERSION = 1
+CASSETTE_DIR = os.environ.get("CASSETTE_DIR", "cassettes")
+
+MODO_RECORD = "record"
+MODO_REPLAY = "replay"
+VELOCIDAD_GRABADA = "recorded"
+VELOCIDAD_MAXIMA = "fast"
+
+_cassette_activo: contextvars.ContextVar[Optional["Cassette"]] = contextvars.ContextVar(
+    "cassette_activo", default=None
+)
+
+
+class CassetteError(Exception):
+    """La cassette no tiene la interacción que el workflow está pidiendo."""
+
+
+def _serializar(obj: Any) -> Any:
+    """Convierte objetos del framework (SerializationMixin) a estructuras JSON."""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, (list, tuple)):
+        return [_serializar(o) for o in obj]
+    if isinstance(obj, dict):
+        return {k: _serializar(v) for k, v in obj.items()}
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    return str(obj)
+
+
+def _huella(request: Any) -> str:
+    """Hash corto del request, para detectar si el workflow cambió respecto de la grabación."""
+    crudo = json.dumps(request, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(crudo.encode("utf-8")).hexdigest()[:16]
+
+
+class Cassette:
+    """Interacciones grabadas de un workflow, consumidas en orden por canal."""
+
+    def __init__(
+        self,
+        nombre: str,
+        modo: str = MODO_REPLAY,
+        velocidad: str = VELOCIDAD_MAXIMA,
+        interacciones: Optional[List[Dict[str, Any]]] = None,
+        directorio: str = CASSETTE_DIR,
+    ):
+        self.nombre = nombre
+        self.modo = modo
+        self.velocidad = velocidad
+        self.interacciones: List[Dict[str, Any]] = interacciones or []
+        self.ruta = os.path.join(directorio, f"{nombre}.json.gz")
+        self.desajustes = 0
+        # Tiempo consumido dentro de modelos y tools reproducidos (para el benchmark)
+        self.metricas = {"modelo_s": 0.0, "tools_s": 0.0, "llamadas_modelo": 0, "llamadas_tools": 0}
+        self._colas: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        for interaccion in self.interacciones:
+            self._colas[(interaccion["kind"], interaccion["channel"])].append(interaccion)
+
+    # --- Persistencia ---
+
+    @classmethod
+    def cargar(cls, nombre: str, velocidad: str = VELOCIDAD_MAXIMA, directorio: str = CASSETTE_DIR) -> "Cassette":
+        ruta = os.path.join(directorio, f"{nombre}.json.gz")
+        with gzip.open(ruta, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise CassetteError(f"Versión de cassette no soportada en {ruta}: {data.get('version')}")
+        return cls(nombre, MODO_REPLAY, velocidad, data["interactions"], directorio)
+
+    @classmethod
+    def desde_entorno(cls, nombre: str) -> Optional["Cassette"]:
+        """Cassette según CASSETTE_MODE (None si está desactivado)."""
+        modo = os.environ.get("CASSETTE_MODE", "off").lower()
+        velocidad = os.environ.get("CASSETTE_SPEED", VELOCIDAD_GRABADA).lower()
+        if modo == MODO_RECORD:
+            return cls(nombre, MODO_RECORD, velocidad)
+        if modo == MODO_REPLAY:
+            return cls.cargar(nombre, velocidad)
+        return None
+
+    def guardar(self) -> None:
+        if self.modo != MODO_RECORD:
+            return
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        data = {"version": CASSETTE_VERSION, "workflow": self.nombre, "interactions": self.interacciones}
+        with gzip.open(self.ruta, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"), default=str)
+        print(f"[CASSETTE] {len(self.interacciones)} interacciones grabadas en {self.ruta}")
+
+    # --- Grabación / Reproducción ---
+
+    def agregar(self, kind: str, canal: str, request: Any, **datos: Any) -> None:
+        request = _serializar(request)
+        self.interacciones.append(
+            {"kind": kind, "channel": canal, "fingerprint": _huella(request), "request": request, **datos}
+        )
+
+    def siguiente(self, kind: str, canal: str, request: Any) -> Dict[str, Any]:
+        cola = self._colas[(kind, canal)]
+        if not cola:
+            raise CassetteError(f"La cassette '{self.nombre}' no tiene más interacciones '{kind}' en '{canal}'.")
+        interaccion = cola.popleft()
+        if _huella(_serializar(request)) != interaccion["fingerprint"]:
+            # El workflow cambió (prompts, historial): se reproduce igual, pero se informa.
+            self.desajustes += 1
+        return interaccion
+
+    async def esperar(self, segundos: float) -> None:
+        if self.velocidad == VELOCIDAD_GRABADA and segundos > 0:
+            await asyncio.sleep(segundos)
+
+    def replay_client(self, canal: str = "chat") -> "ReplayChatClient":
+        return ReplayChatClient(self, canal)
+
+    def grabar(self, client: Any, canal: str = "chat") -> Any:
+        """
+        Intercepta las llamadas al modelo de un cliente real (por instancia).
+        Se graba a nivel `_inner_*`, debajo de la invocación de funciones del framework.
+        """
+        cassette = self
+        original = client._inner_get_response
+        original_stream = client._inner_get_streaming_response
+
+        # Las opciones del chat (`options` o `chat_options`, según la versión del framework)
+        # pasan tal cual en **kwargs: solo se graban los mensajes.
+        async def _get_response(*, messages, **kwargs):
+            inicio = time.perf_counter()
+            respuesta = await original(messages=messages, **kwargs)
+            cassette.agregar(
+                "chat", canal, messages,
+                response=_serializar(respuesta),
+                duration_s=round(time.perf_counter() - inicio, 4),
+            )
+            return respuesta
+
+        async def _get_streaming_response(*, messages, **kwargs):
+            inicio = time.perf_counter()
+            chunks = []
+            async for update in original_stream(messages=messages, **kwargs):
+                chunks.append({"t": round(time.perf_counter() - inicio, 4), "update": _serializar(update)})
+                yield update
+            cassette.agregar(
+                "stream", canal, messages,
+                chunks=chunks,
+                duration_s=round(time.perf_counter() - inicio, 4),
+            )
+
+        client._inner_get_response = _get_response
+        client._inner_get_streaming_response = _get_streaming_response
+        return client
+
+
+@use_function_invocation
+class ReplayChatClient(BaseChatClient):
+    """Cliente de chat offline que reproduce las respuestas de una cassette."""
+
+    OTEL_PROVIDER_NAME = "cassette"
+
+    def __init__(self, cassette: Cassette, canal: str = "chat", **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.canal = canal
+
+    async def _inner_get_response(self, *, messages, **kwargs) -> ChatResponse:
+        inicio = time.perf_counter()
+        interaccion = self.cassette.siguiente("chat", self.canal, messages)
+        await self.cassette.esperar(interaccion["duration_s"])
+        respuesta = ChatResponse.from_dict(interaccion["response"])
+        self.cassette.metricas["modelo_s"] += time.perf_counter() - inicio
+        self.cassette.metricas["llamadas_modelo"] += 1
+        return respuesta
+
+    async def _inner_get_streaming_response(self, *, messages, **kwargs):
+        inicio = time.perf_counter()
+        interaccion = self.cassette.siguiente("stream", self.canal, messages)
+        anterior = 0.0
+        for chunk in interaccion["chunks"]:
+            # Respetamos el tiempo entre chunks grabado (solo en velocidad 'recorded')
+            await self.cassette.esperar(chunk["t"] - anterior)
+            anterior = chunk["t"]
+            update = ChatResponseUpdate.from_dict(chunk["update"])
+            self.cassette.metricas["modelo_s"] += time.perf_counter() - inicio
+            yield update
+            inicio = time.perf_counter()
+        self.cassette.metricas["modelo_s"] += time.perf_counter() - inicio
+        self.cassette.metricas["llamadas_modelo"] += 1
+
+
+def cliente_chat(cassette: Optional[Cassette], crear: Callable[[], Any], canal: str = "chat") -> Any:
+    """Cliente real (grabado si corresponde) o cliente de replay, según el modo de la cassette."""
+    if cassette is not None and cassette.modo == MODO_REPLAY:
+        return cassette.replay_client(canal)
+    client = crear()
+    if cassette is not None:
+        cassette.grabar(client, canal)
+    return client
+
+# =============================================================================
+# TOOLS
+# =============================================================================
+
+def cassette_activo() -> Optional[Cassette]:
+    return _cassette_activo.get()
+
+
+@contextmanager
+def cassette_scope(cassette: Optional[Cassette]) -> Iterator[Optional[Cassette]]:
+    """Publica la cassette para las tools envueltas con `@grabar_tool`."""
+    token = _cassette_activo.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _cassette_activo.reset(token)
+
+
+def grabar_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Graba (o reproduce) el resultado de una tool async según la cassette activa.
+    Sin cassette activa, la tool se ejecuta normalmente.
+    """
+    canal = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        cassette = cassette_activo()
+        if cassette is None:
+            return await func(*args, **kwargs)
+
+        request = {"args": list(args), "kwargs": kwargs}
+        inicio = time.perf_counter()
+        if cassette.modo == MODO_REPLAY:
+            interaccion = cassette.siguiente("tool", canal, request)
+            await cassette.esperar(interaccion["duration_s"])
+            cassette.metricas["tools_s"] += time.perf_counter() - inicio
+            cassette.metricas["llamadas_tools"] += 1
+            return interaccion["result"]
+
+        resultado = await func(*args, **kwargs)
+        cassette.agregar(
+            "tool", canal, request,
+            result=_serializar(resultado),
+            duration_s=round(time.perf_counter() - inicio, 4),
+        )
+        return resultado
+
+    return wrapper
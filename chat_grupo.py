@@ -7,6 +7,8 @@ from agent_framework import FileCheckpointStorage # Necesario para persistencia
 # from agent_framework.observability import setup_observability # Comentado para evitar errores si no hay servidor OTLP
 from dotenv import load_dotenv
 
+from cassette import Cassette, cassette_scope, cliente_chat
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -15,11 +17,10 @@ load_dotenv()
 # De lo contrario, generará los errores de conexión que experimentó[cite: 3279].
 # setup_observability(otlp_endpoint="http://localhost:4317")
 
-async def main():
-    # 2. Configuración del Cliente del Modelo
-    # Usamos DefaultAzureCredential para mayor flexibilidad en autenticación local/nube[cite: 4190].
-    client = AzureOpenAIChatClient(credential=DefaultAzureCredential())
+TASK_INPUT = "Investiga sobre el impacto de la computación cuántica en la criptografía y escribe un resumen breve."
 
+def construir_workflow(client, checkpoint_storage):
+    """Arma el chat grupal (Investigador, Escritor, Revisor) sobre el cliente de chat recibido."""
     # 3. Definición de Agentes Especializados
     # Agente 1: Investigador [cite: 4044]
     researcher = ChatAgent(
@@ -44,9 +45,7 @@ async def main():
 
     # 4. Construcción del Flujo de Trabajo
     # Utilizamos un gestor basado en prompts para orquestar dinámicamente los turnos[cite: 4428].
-    checkpoint_storage = FileCheckpointStorage(storage_path="/app/data/checkpoints")
-
-    workflow = (
+    return (
         GroupChatBuilder()
         .set_prompt_based_manager(
             chat_client=client,
@@ -59,29 +58,42 @@ async def main():
         .build()
     )
 
+async def main():
+    # 2. Configuración del Cliente del Modelo
+    # Usamos DefaultAzureCredential para mayor flexibilidad en autenticación local/nube[cite: 4190].
+    # Con CASSETTE_MODE=record|replay el cliente se graba o se reproduce offline.
+    cassette = Cassette.desde_entorno("chat_grupo")
+    client = cliente_chat(cassette, lambda: AzureOpenAIChatClient(credential=DefaultAzureCredential()))
+
+    checkpoint_storage = FileCheckpointStorage(storage_path="/app/data/checkpoints")
+    workflow = construir_workflow(client, checkpoint_storage)
+
     # 5. Ejecución del Flujo de Trabajo
     print(f"Iniciando orquestación de Chat Grupal compleja...")
-    task_input = "Investiga sobre el impacto de la computación cuántica en la criptografía y escribe un resumen breve."
 
     # Se utiliza 'run_stream' para procesamiento en tiempo real[cite: 4055].
-    async for event in workflow.run_stream(task_input):
-        # Manejo del resultado final
-        if isinstance(event, WorkflowOutputEvent):
-            # CORRECCIÓN: Accedemos al contenido del mensaje en lugar de imprimir el objeto
-            # Dependiendo de la estructura exacta del mensaje final, accedemos a .text o iteramos el contenido.
-            final_data = event.data
-            if hasattr(final_data, 'text'):
-                print(f"\n[RESULTADO FINAL]: {final_data.text}")
-            else:
-                print(f"\n[RESULTADO FINAL (Raw)]: {final_data}")
+    with cassette_scope(cassette):
+        async for event in workflow.run_stream(TASK_INPUT):
+            # Manejo del resultado final
+            if isinstance(event, WorkflowOutputEvent):
+                # CORRECCIÓN: Accedemos al contenido del mensaje en lugar de imprimir el objeto
+                # Dependiendo de la estructura exacta del mensaje final, accedemos a .text o iteramos el contenido.
+                final_data = event.data
+                if hasattr(final_data, 'text'):
+                    print(f"\n[RESULTADO FINAL]: {final_data.text}")
+                else:
+                    print(f"\n[RESULTADO FINAL (Raw)]: {final_data}")
+
+            # Manejo de streaming de tokens y actualizaciones de agentes
+            elif hasattr(event, 'data') and hasattr(event, 'source'):
+                 # Filtramos para mostrar solo texto relevante y evitar ruido excesivo
+                 data_str = str(event.data)
+                 if "text=" in data_str: 
+                     # Extracción simple para log de depuración
+                     print(f"[{event.source} Activo] Procesando...")
 
-        # Manejo de streaming de tokens y actualizaciones de agentes
-        elif hasattr(event, 'data') and hasattr(event, 'source'):
-             # Filtramos para mostrar solo texto relevante y evitar ruido excesivo
-             data_str = str(event.data)
-             if "text=" in data_str: 
-                 # Extracción simple para log de depuración
-                 print(f"[{event.source} Activo] Procesando...")
+    if cassette is not None:
+        cassette.guardar()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,38 @@
+import asyncio
+from dotenv import load_dotenv
+
+from transport import close_shared_transport, get_openai_client, pool_stats
+
+# Variante asíncrona de conversation.py: las dos preguntas reutilizan la misma conexión
+load_dotenv()
+
+agent_name = "R2D2-General-Agent"
+
+async def main() -> None:
+    openai_client = get_openai_client()
+    try:
+        # Optional Step: Create a conversation to use with the agent
+        conversation = await openai_client.conversations.create()
+        print(f"Created conversation (id: {conversation.id})")
+
+        # Chat with the agent to answer questions
+        response = await openai_client.responses.create(
+            conversation=conversation.id, #Optional conversation context for multi-turn
+            extra_body={"agent": {"name": agent_name, "type": "agent_reference"}},
+            input="What is the size of France in square miles?",
+        )
+        print(f"Response output: {response.output_text}")
+
+        # Optional Step: Ask a follow-up question in the same conversation
+        response = await openai_client.responses.create(
+            conversation=conversation.id,
+            extra_body={"agent": {"name": agent_name, "type": "agent_reference"}},
+            input="And what is the capital city?",
+        )
+        print(f"Response output: {response.output_text}")
+        print(f"[POOL] {pool_stats()}")
+    finally:
+        await close_shared_transport()
+
+if __name__ == "__main__":
+    asyncio.run(main())
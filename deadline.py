@@ -0,0 +1,134 @@
+"""
+Deadlines de solicitud para el orquestador y los agentes trabajadores.
+
+El deadline se fija UNA sola vez en el punto de entrada (`/ask`, CLI) y se propaga
+mediante un ContextVar hasta cada agente y cada tool. Cada etapa recibe como presupuesto
+el tiempo restante (menos una reserva opcional para la etapa que la contiene); cuando el
+presupuesto se agota, la ejecución en curso se cancela y se devuelve un valor de respaldo
+en lugar de dejar la solicitud colgada.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, Iterator, List, Optional
+
+# Presupuesto total por defecto (segundos) si el punto de entrada no especifica uno.
+DEFAULT_TIMEOUT_S = float(os.environ.get("REQUEST_TIMEOUT_S", "60"))
+# Tope que ningún cliente puede superar (por defecto, el mismo presupuesto por defecto).
+MAX_TIMEOUT_S = float(os.environ.get("REQUEST_MAX_TIMEOUT_S", str(DEFAULT_TIMEOUT_S)))
+
+_current_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+@dataclass
+class StageRecord:
+    """Contabilidad de una etapa ejecutada bajo el deadline (para la traza)."""
+    name: str
+    budget_s: float
+    elapsed_s: float = 0.0
+    status: str = "pending"  # ok | cancelled | skipped | error
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "budget_s": round(self.budget_s, 3),
+            "elapsed_s": round(self.elapsed_s, 3),
+            "status": self.status,
+        }
+
+
+@dataclass
+class Deadline:
+    """Instante límite (reloj monotónico) compartido por toda la solicitud."""
+    expires_at: float
+    started_at: float = field(default_factory=time.monotonic)
+    stages: List[StageRecord] = field(default_factory=list)
+    # Resultados intermedios (ya citados) que sirven para armar una respuesta parcial.
+    partials: List[tuple] = field(default_factory=list)
+
+    @classmethod
+    def from_timeout(cls, timeout_s: Optional[float] = None) -> "Deadline":
+        now = time.monotonic()
+        budget = DEFAULT_TIMEOUT_S if timeout_s is None else min(timeout_s, MAX_TIMEOUT_S)
+        return cls(expires_at=now + budget, started_at=now)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def add_partial(self, stage: str, text: str) -> None:
+        if text:
+            self.partials.append((stage, text))
+
+    async def run_stage(
+        self,
+        name: str,
+        aw: Awaitable[Any],
+        *,
+        reserve_s: float = 0.0,
+        fallback: Any = None,
+    ) -> Any:
+        """
+        Ejecuta `aw` con el presupuesto restante menos `reserve_s`.
+        Si el tiempo se agota, cancela la ejecución y devuelve `fallback`.
+        """
+        budget = self.remaining() - reserve_s
+        record = StageRecord(name=name, budget_s=max(0.0, budget))
+        self.stages.append(record)
+
+        if budget <= 0:
+            # No hay tiempo: ni siquiera arrancamos la etapa.
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            record.status = "skipped"
+            return fallback
+
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(aw, timeout=budget)
+            record.status = "ok"
+            return result
+        except asyncio.TimeoutError:
+            record.status = "cancelled"
+            return fallback
+        except asyncio.CancelledError:
+            # Cancelada desde afuera (p. ej. venció el presupuesto de la etapa que la contiene)
+            record.status = "cancelled"
+            raise
+        except Exception:
+            record.status = "error"
+            raise
+        finally:
+            record.elapsed_s = time.monotonic() - start
+
+    def summary(self) -> Dict[str, Any]:
+        """Traza con el consumo de presupuesto por etapa."""
+        return {
+            "total_budget_s": round(self.expires_at - self.started_at, 3),
+            "elapsed_s": round(time.monotonic() - self.started_at, 3),
+            "remaining_s": round(self.remaining(), 3),
+            "stages": [s.as_dict() for s in self.stages],
+        }
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline de la solicitud en curso (None si se llama fuera de un scope)."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """Publica el deadline para los agentes y tools ejecutados dentro del bloque."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
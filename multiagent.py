@@ -1,13 +1,17 @@
 import asyncio
 import os
-from typing import Annotated
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, AsyncIterator, Callable, Optional
 
-from agent_framework import HostedCodeInterpreterTool
-from agent_framework.azure import AzureAIClient
-from azure.identity.aio import AzureCliCredential
+from agent_framework import ChatAgent, HostedCodeInterpreterTool
 from pydantic import Field
 from dotenv import load_dotenv
 
+from deadline import DEFAULT_TIMEOUT_S, Deadline, current_deadline, deadline_scope
+from router import TIEMPO_AGOTADO, RouterStats, ejecutar_con_ruteo, large_deployment, tiempo_agotado
+from cassette import MODO_REPLAY, Cassette, cassette_activo, cassette_scope, grabar_tool
+from transport import close_shared_transport, get_azure_ai_client, pool_stats
+
 load_dotenv()
 
 # --- CONFIGURACIÓN DE ENTORNO ---
@@ -16,12 +20,29 @@ load_dotenv()
 # AZURE_AI_MODEL_DEPLOYMENT_NAME="gpt-4o"
 # AI_SEARCH_PROJECT_CONNECTION_ID="/subscriptions/.../connections/iasearchtest001freezw870h"
 # AI_SEARCH_INDEX_NAME="nombre-de-tu-indice-real"
+# AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME="gpt-4o-mini"  # Opcional: modelo rápido para búsquedas simples
+# REQUEST_TIMEOUT_S="60"  # Presupuesto total de la consulta (orquestador + agentes)
+
+# Tiempo reservado para que el orquestador redacte la respuesta final
+# después de que un agente trabajador agote su presupuesto.
+ORQUESTADOR_RESERVA_S = float(os.environ.get("ORQUESTADOR_RESERVA_S", "5"))
+if ORQUESTADOR_RESERVA_S >= DEFAULT_TIMEOUT_S:
+    # Con esta configuración ningún agente trabajador llega a ejecutarse (etapas 'skipped').
+    print(
+        f"[AVISO] ORQUESTADOR_RESERVA_S ({ORQUESTADOR_RESERVA_S}s) >= REQUEST_TIMEOUT_S ({DEFAULT_TIMEOUT_S}s): "
+        "los agentes trabajadores se omitirán en todas las consultas."
+    )
+
+# Estadísticas del router para las búsquedas del Extractor (una entrada por llamada a la tool).
+# El orquestador siempre usa el modelo grande y no pasa por el router.
+EXTRACTOR_ROUTER_STATS = RouterStats()
 
 # =============================================================================
 # AGENTE 1: EL EXTRACTOR (Usando tu configuración Nativa de Search)
 # =============================================================================
 
-async def run_search_worker(query: str) -> str:
+@grabar_tool
+async def run_search_worker(query: str, deployment: str) -> str:
     """
     Instancia un agente efímero conectado nativamente a Azure AI Search
     para recuperar datos reales sin alucinaciones.
@@ -49,21 +70,21 @@ async def run_search_worker(query: str) -> str:
         },
     }
 
-    async with AzureCliCredential() as credential:
-        async with AzureAIClient(async_credential=credential).create_agent(
-            name="Tecpetrol-Search-Worker",
-            model=os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"],
-            instructions=instructions,
-            tools=search_tool_config, # <--- Tu configuración nativa aquí
-        ) as agent:
-            # Ejecutamos la consulta y devolvemos el resultado textual al orquestador
-            response = await agent.run(query)
-            return str(response.message.content)
+    async with get_azure_ai_client().create_agent(
+        name="Tecpetrol-Search-Worker",
+        model=deployment,
+        instructions=instructions,
+        tools=search_tool_config, # <--- Tu configuración nativa aquí
+    ) as agent:
+        # Ejecutamos la consulta y devolvemos el resultado textual al orquestador
+        response = await agent.run(query)
+        return str(response.message.content)
 
 # =============================================================================
 # AGENTE 2: EL AUDITOR (Analista Matemático con Python)
 # =============================================================================
 
+@grabar_tool
 async def run_audit_worker(contexto_financiero: str, tarea_calculo: str) -> str:
     """
     Instancia un agente efímero con Code Interpreter para validar números.
@@ -88,41 +109,70 @@ async def run_audit_worker(contexto_financiero: str, tarea_calculo: str) -> str:
     {tarea_calculo}
     """
 
-    async with AzureCliCredential() as credential:
-        async with AzureAIClient(async_credential=credential).create_agent(
-            name="Tecpetrol-Math-Auditor",
-            model=os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"],
-            instructions=instructions,
-            tools=HostedCodeInterpreterTool(), # <--- Python Sandbox real
-        ) as agent:
-            response = await agent.run(prompt_completo)
-            return str(response.message.content)
+    async with get_azure_ai_client().create_agent(
+        name="Tecpetrol-Math-Auditor",
+        model=large_deployment(), # Las auditorías siempre van al modelo grande
+        instructions=instructions,
+        tools=HostedCodeInterpreterTool(), # <--- Python Sandbox real
+    ) as agent:
+        response = await agent.run(prompt_completo)
+        return str(response.message.content)
 
 # =============================================================================
 # HERRAMIENTAS DEL ORQUESTADOR (Wrappers)
 # =============================================================================
+# Las cassettes graban a los agentes trabajadores (`@grabar_tool` en `run_*_worker`), no a estas
+# tools: en replay el deadline, el ruteo/escalamiento y las respuestas parciales se ejecutan igual.
 
 async def tool_consultar_datos(
     tema: Annotated[str, Field(description="El tema financiero a buscar (ej: 'EBITDA Q3 2025').")]
 ) -> str:
     """Llama al Agente Extractor para buscar en documentos reales."""
-    return await run_search_worker(tema)
+    deadline = current_deadline()
+
+    async def _buscar(deployment: str) -> str:
+        if deadline is None:
+            return await run_search_worker(tema, deployment)
+        return await deadline.run_stage(
+            f"extractor[{deployment}]",
+            run_search_worker(tema, deployment),
+            reserve_s=ORQUESTADOR_RESERVA_S,
+            fallback=f"{TIEMPO_AGOTADO} El Extractor no terminó la búsqueda a tiempo. Responde con los datos ya obtenidos.",
+        )
+
+    # Búsquedas simples van al modelo rápido; si no trae citas se escala al grande.
+    resultado, _ = await ejecutar_con_ruteo(tema, _buscar, stats=EXTRACTOR_ROUTER_STATS)
+    if deadline is None:
+        return resultado
+    # Los datos del Extractor ya vienen citados: sirven como respuesta parcial.
+    if not tiempo_agotado(resultado):
+        deadline.add_partial("extractor", resultado)
+    return resultado
 
 async def tool_auditar_datos(
     datos_texto: Annotated[str, Field(description="El texto con los datos financieros encontrados.")],
     calculo_requerido: Annotated[str, Field(description="Instrucción de qué validar (ej: 'Recalcular margen EBITDA').")]
 ) -> str:
     """Llama al Agente Auditor para ejecutar Python y verificar cifras."""
-    return await run_audit_worker(datos_texto, calculo_requerido)
+    deadline = current_deadline()
+    if deadline is None:
+        return await run_audit_worker(datos_texto, calculo_requerido)
+
+    resultado = await deadline.run_stage(
+        "auditor",
+        run_audit_worker(datos_texto, calculo_requerido),
+        reserve_s=ORQUESTADOR_RESERVA_S,
+        fallback=f"{TIEMPO_AGOTADO} El Auditor no terminó la verificación. Presenta los datos como NO VERIFICADOS.",
+    )
+    if not tiempo_agotado(resultado):
+        deadline.add_partial("auditor", resultado)
+    return resultado
 
 # =============================================================================
 # AGENTE 3: EL ORQUESTADOR
 # =============================================================================
 
-async def main() -> None:
-    print("=== SISTEMA MULTI-AGENTE FINANCIERO (Orquestador + RAG Nativo + Python) ===")
-
-    orquestador_instructions = """
+ORQUESTADOR_INSTRUCTIONS = f"""
     Eres el Gerente de Finanzas de Tecpetrol.
     Tu objetivo es responder consultas complejas coordinando a tu equipo.
     
@@ -135,27 +185,116 @@ async def main() -> None:
     2. Pide los datos al Extractor.
     3. Envía esos datos al Auditor para que recalcule las métricas clave.
     4. Si el Auditor detecta una anomalía, avisa al usuario. Si no, presenta el resultado validado.
+    5. Si una herramienta responde "{TIEMPO_AGOTADO}", no la reintentes: responde con lo que ya tengas.
     """
 
-    async with AzureCliCredential() as credential:
-        async with AzureAIClient(async_credential=credential).create_agent(
+USER_QUERY = "Dime la información financiera del tercer trimestre de 2025. Verifica matemáticamente si las sumas de ingresos o costos cuadran con el resultado operativo."
+
+@asynccontextmanager
+async def crear_orquestador(deployment: str) -> AsyncIterator[ChatAgent]:
+    """
+    Crea el agente orquestador en Azure AI Foundry.
+    Con una cassette activa en modo replay, usa el cliente offline (sin red).
+    """
+    cassette = cassette_activo()
+    if cassette is not None and cassette.modo == MODO_REPLAY:
+        yield ChatAgent(
             name="Tecpetrol-Orquestador",
-            model=os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"],
-            instructions=orquestador_instructions,
+            chat_client=cassette.replay_client("orquestador"),
+            instructions=ORQUESTADOR_INSTRUCTIONS,
             tools=[tool_consultar_datos, tool_auditar_datos],
-        ) as orquestador:
-            
-            # --- CONSULTA DE PRUEBA ---
-            user_query = "Dime la información financiera del tercer trimestre de 2025. Verifica matemáticamente si las sumas de ingresos o costos cuadran con el resultado operativo."
-            
-            print(f"Usuario: {user_query}")
-            print("Orquestador pensando... (Esto puede tomar unos segundos mientras coordina a los agentes)\n")
-            
-            # Usamos run_stream para ver la respuesta final generándose
+        )
+        return
+
+    cliente = get_azure_ai_client()
+    if cassette is not None:
+        cassette.grabar(cliente, "orquestador")
+    async with cliente.create_agent(
+        name="Tecpetrol-Orquestador",
+        model=deployment,
+        instructions=ORQUESTADOR_INSTRUCTIONS,
+        tools=[tool_consultar_datos, tool_auditar_datos],
+    ) as orquestador:
+        yield orquestador
+
+async def ejecutar_orquestador(
+    user_query: str,
+    deadline: Deadline,
+    al_actualizar: Optional[Callable[[Any], None]] = None,
+) -> str:
+    """
+    Ejecuta la consulta completa dentro del deadline.
+    Si el tiempo se agota, cancela a los agentes en curso y devuelve una respuesta
+    parcial armada con los resultados (citados) que ya se hayan obtenido.
+    `al_actualizar` recibe cada update del stream (para mostrarlo o contar eventos); esta
+    función no escribe en stdout.
+    """
+    chunks: list[str] = []
+
+    async def _orquestar(deployment: str) -> str:
+        async with crear_orquestador(deployment) as orquestador:
             async for chunk in orquestador.run_stream(user_query):
+                if al_actualizar is not None:
+                    al_actualizar(chunk)
                 if chunk.text:
-                    print(chunk.text, end="", flush=True)
-            print("\n")
+                    chunks.append(chunk.text)
+        return "".join(chunks)
+
+    # El orquestador coordina y combina resultados: siempre en el modelo grande.
+    # El ruteo (y el escalamiento) se hace por búsqueda, dentro de `tool_consultar_datos`.
+    deployment = large_deployment()
+    with deadline_scope(deadline):
+        respuesta = await deadline.run_stage(f"orquestador[{deployment}]", _orquestar(deployment))
+
+    if respuesta is not None:
+        return respuesta
+
+    # Deadline agotado: devolvemos lo que haya llegado, nunca una espera indefinida.
+    partes = ["[RESPUESTA PARCIAL] Se agotó el tiempo disponible antes de completar la consulta."]
+    for etapa, texto in deadline.partials:
+        partes.append(f"\n--- {etapa.upper()} ---\n{texto}")
+    if chunks:
+        partes.append(f"\n--- ORQUESTADOR (incompleto) ---\n{''.join(chunks)}")
+    return "\n".join(partes)
+
+def _mostrar(chunk: Any) -> None:
+    # Usamos run_stream para ver la respuesta final generándose
+    if chunk.text:
+        print(chunk.text, end="", flush=True)
+
+async def main() -> None:
+    print("=== SISTEMA MULTI-AGENTE FINANCIERO (Orquestador + RAG Nativo + Python) ===")
+
+    # El deadline se fija una sola vez aquí y se propaga a todos los agentes y tools.
+    deadline = Deadline.from_timeout()
+
+    # Con CASSETTE_MODE=record|replay se graban o reproducen modelo y tools
+    cassette = Cassette.desde_entorno("multiagent")
+
+    # --- CONSULTA DE PRUEBA ---
+    print(f"Usuario: {USER_QUERY}")
+    print("Orquestador pensando... (Esto puede tomar unos segundos mientras coordina a los agentes)\n")
+
+    try:
+        with cassette_scope(cassette):
+            respuesta = await ejecutar_orquestador(USER_QUERY, deadline, al_actualizar=_mostrar)
+    finally:
+        # Estadísticas del pool compartido antes de cerrarlo
+        stats_pool = pool_stats()
+        await close_shared_transport()
+    if cassette is not None:
+        cassette.guardar()
+    if respuesta.startswith("[RESPUESTA PARCIAL]"):
+        print(f"\n\n{respuesta}")
+    print("\n")
+
+    # Traza: presupuesto consumido por etapa
+    traza = deadline.summary()
+    print(f"[TRAZA] Presupuesto total: {traza['total_budget_s']}s | Consumido: {traza['elapsed_s']}s")
+    for etapa in traza["stages"]:
+        print(f"  - {etapa['stage']}: {etapa['status']} ({etapa['elapsed_s']}s de {etapa['budget_s']}s)")
+    print(f"[ROUTER EXTRACTOR] {EXTRACTOR_ROUTER_STATS.summary()}")
+    print(f"[POOL] {stats_pool}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
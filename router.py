@@ -0,0 +1,271 @@
+"""
+Router de complejidad de consultas entre deployments de modelos.
+
+Un clasificador local (reglas + features livianas, sin llamar a ningún modelo) decide si
+la consulta es una búsqueda simple (un dato, un periodo) o una consulta compleja
+(comparaciones entre periodos, auditorías, varias métricas):
+- Simple  -> deployment rápido (AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME).
+- Compleja -> deployment grande (AZURE_AI_MODEL_DEPLOYMENT_NAME).
+
+Si la respuesta del modelo rápido no tiene citas o no pasa la validación, la consulta
+se escala al modelo grande. Si no hay deployment rápido configurado, todo va al grande.
+"""
+
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from deadline import current_deadline
+
+# =============================================================================
+# CONFIGURACIÓN DE DEPLOYMENTS
+# =============================================================================
+
+TIER_FAST = "fast"
+TIER_LARGE = "large"
+
+def large_deployment() -> str:
+    return os.environ.get("AZURE_AI_MODEL_DEPLOYMENT_NAME", "gpt-4o")
+
+def fast_deployment() -> Optional[str]:
+    return os.environ.get("AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME") or None
+
+# Costo relativo por consulta de cada tier (grande = 1.0), usado para estimar el ahorro.
+COSTO_RELATIVO = {
+    TIER_FAST: float(os.environ.get("ROUTER_FAST_RELATIVE_COST", "0.1")),
+    TIER_LARGE: 1.0,
+}
+
+# =============================================================================
+# CLASIFICADOR LOCAL (Reglas + Features)
+# =============================================================================
+
+_TRIMESTRES = re.compile(
+    r"\b(q[1-4]|t[1-4]|[1-4]t|(?:primer|segundo|tercer|cuarto)\s+(?:trimestre|semestre)|"
+    r"enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)\b"
+)
+_ANIOS = re.compile(r"\b20\d{2}\b")
+_COMPARACION = re.compile(
+    r"\b(compar\w*|versus|vs\.?|variaci[oó]n\w*|evoluci[oó]n|diferencia\w*|crecimiento|"
+    r"respecto|frente a|interanual|tendencia\w*)\b"
+)
+_AUDITORIA = re.compile(
+    r"\b(verific\w*|audit\w*|valid\w*|recalcul\w*|cuadra\w*|comprueb\w*|comprob\w*|anomal\w*|"
+    r"concilia\w*)\b"
+)
+_METRICAS = re.compile(
+    r"\b(ingresos?|ebitda|costos?|margen|resultado|utilidad|ganancias?|deuda|capex|"
+    r"flujo|producci[oó]n|inversi[oó]n\w*)\b"
+)
+
+# Umbrales del clasificador
+MAX_PALABRAS_SIMPLE = 30
+MAX_METRICAS_SIMPLE = 2
+
+
+@dataclass
+class RoutingDecision:
+    """Resultado del ruteo de una consulta."""
+    tier: str
+    deployment: str
+    reason: str
+    features: Dict[str, int] = field(default_factory=dict)
+    escalated: bool = False
+
+
+def extraer_features(query: str) -> Dict[str, int]:
+    """Features livianas de la consulta (todo local, sin llamadas a modelos)."""
+    texto = query.lower()
+    trimestres = {re.sub(r"\s+", " ", m.group(0)) for m in _TRIMESTRES.finditer(texto)}
+    anios = set(_ANIOS.findall(texto))
+    return {
+        "palabras": len(texto.split()),
+        # "Q3 2025" es un periodo; "Q2 vs Q3" o "2024 y 2025" son dos.
+        "periodos": max(len(trimestres), len(anios)),
+        "comparacion": len(_COMPARACION.findall(texto)),
+        "auditoria": len(_AUDITORIA.findall(texto)),
+        "metricas": len({m.group(0) for m in _METRICAS.finditer(texto)}),
+    }
+
+
+def clasificar(query: str, *, force_tier: Optional[str] = None) -> RoutingDecision:
+    """Decide qué deployment atiende la consulta."""
+    features = extraer_features(query)
+    fast = fast_deployment()
+
+    if fast is None:
+        return RoutingDecision(TIER_LARGE, large_deployment(), "sin deployment rápido configurado", features)
+    if force_tier == TIER_LARGE:
+        return RoutingDecision(TIER_LARGE, large_deployment(), "forzado", features)
+    if force_tier == TIER_FAST:
+        return RoutingDecision(TIER_FAST, fast, "forzado", features)
+
+    if features["auditoria"]:
+        reason = "solicitud de auditoría/verificación"
+    elif features["comparacion"]:
+        reason = "comparación"
+    elif features["periodos"] >= 2:
+        reason = "varios periodos"
+    elif features["metricas"] > MAX_METRICAS_SIMPLE:
+        reason = "varias métricas"
+    elif features["palabras"] > MAX_PALABRAS_SIMPLE:
+        reason = "consulta extensa"
+    else:
+        return RoutingDecision(TIER_FAST, fast, "búsqueda simple", features)
+
+    return RoutingDecision(TIER_LARGE, large_deployment(), reason, features)
+
+# =============================================================================
+# VALIDACIÓN DE RESPUESTAS
+# =============================================================================
+
+_CITA = re.compile(r"\[[^\[\]]+†[^\[\]]+\]")
+_SIN_INFORMACION = "no encontré información"
+# Prefijo de los valores de respaldo de las etapas cortadas por el deadline.
+TIEMPO_AGOTADO = "[TIEMPO AGOTADO]"
+
+
+def tiempo_agotado(texto: Optional[str]) -> bool:
+    """La ejecución no terminó por el deadline (etapa cancelada u omitida)."""
+    return texto is None or texto.startswith(TIEMPO_AGOTADO)
+
+
+def validar_respuesta(texto: Optional[str]) -> bool:
+    """
+    Una respuesta es válida si no está vacía y trae al menos una cita `[doc_id†source]`.
+    La respuesta honesta de "no encontré información" también se acepta.
+    """
+    if tiempo_agotado(texto) or not texto.strip():
+        return False
+    if _SIN_INFORMACION in texto.lower():
+        return True
+    return bool(_CITA.search(texto))
+
+# =============================================================================
+# ESTADÍSTICAS (Latencia, Costo, Escalamiento)
+# =============================================================================
+
+@dataclass
+class RouterStats:
+    """Contadores acumulados del router. Cada punto de entrada lleva su propia instancia."""
+    consultas: Dict[str, int] = field(default_factory=lambda: {TIER_FAST: 0, TIER_LARGE: 0})
+    latencia_s: Dict[str, float] = field(default_factory=lambda: {TIER_FAST: 0.0, TIER_LARGE: 0.0})
+    escalamientos: int = 0
+    costo_relativo: float = 0.0
+
+    def registrar(self, tier: str, latencia_s: float) -> None:
+        self.consultas[tier] += 1
+        self.latencia_s[tier] += latencia_s
+        self.costo_relativo += COSTO_RELATIVO[tier]
+
+    def summary(self) -> Dict[str, Any]:
+        rapidas = self.consultas[TIER_FAST]
+        grandes = self.consultas[TIER_LARGE]
+        # Consultas de usuario = llamadas totales menos las repetidas por escalamiento
+        total = rapidas + grandes - self.escalamientos
+        promedio = {
+            tier: round(self.latencia_s[tier] / n, 3) if n else None
+            for tier, n in self.consultas.items()
+        }
+        # Línea base: todas las consultas atendidas por el modelo grande
+        costo_base = total * COSTO_RELATIVO[TIER_LARGE]
+        ahorro_latencia = None
+        if promedio[TIER_FAST] is not None and promedio[TIER_LARGE] is not None:
+            # Las resueltas por el modelo rápido se habrían pagado al promedio del grande;
+            # se descuenta TODO el tiempo del rápido, incluido el perdido en consultas escaladas.
+            resueltas_rapidas = rapidas - self.escalamientos
+            ahorro_latencia = round(
+                self.latencia_s[TIER_LARGE] / grandes * resueltas_rapidas - self.latencia_s[TIER_FAST], 3
+            )
+        return {
+            "consultas": total,
+            "llamadas_por_tier": dict(self.consultas),
+            "latencia_promedio_s": promedio,
+            "escalamientos": self.escalamientos,
+            "tasa_escalamiento": round(self.escalamientos / rapidas, 3) if rapidas else 0.0,
+            "costo_relativo": round(self.costo_relativo, 3),
+            "ahorro_costo_relativo": round(costo_base - self.costo_relativo, 3),
+            "ahorro_latencia_estimado_s": ahorro_latencia,
+        }
+
+
+# =============================================================================
+# EJECUCIÓN CON RUTEO Y ESCALAMIENTO
+# =============================================================================
+
+async def ejecutar_con_ruteo(
+    query: str,
+    run: Callable[[str], Awaitable[Optional[str]]],
+    *,
+    stats: RouterStats,
+    force_tier: Optional[str] = None,
+) -> Tuple[Optional[str], RoutingDecision]:
+    """
+    Ejecuta `run(deployment)` en el deployment elegido por el clasificador.
+    Si el modelo rápido responde sin citas o sin pasar la validación, reintenta con el grande.
+    Las ejecuciones cortadas por el deadline no se escalan ni se registran en `stats`.
+    """
+    decision = clasificar(query, force_tier=force_tier)
+
+    inicio = time.monotonic()
+    texto = await run(decision.deployment)
+    if tiempo_agotado(texto):
+        return texto, decision
+    stats.registrar(decision.tier, time.monotonic() - inicio)
+
+    if decision.tier != TIER_FAST or validar_respuesta(texto):
+        return texto, decision
+
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired():
+        return texto, decision
+
+    print(f"[ROUTER] Respuesta de '{decision.deployment}' sin citas/validación. Escalando a '{large_deployment()}'...")
+    inicio = time.monotonic()
+    texto_grande = await run(large_deployment())
+    if tiempo_agotado(texto_grande):
+        # El escalamiento no llegó a tiempo: mejor la respuesta rápida que nada.
+        return texto, decision
+
+    stats.registrar(TIER_LARGE, time.monotonic() - inicio)
+    stats.escalamientos += 1
+    decision.escalated = True
+    return texto_grande, decision
+
+# =============================================================================
+# DEMO LOCAL (Cliente falso, sin Azure)
+# =============================================================================
+
+async def main() -> None:
+    os.environ.setdefault("AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME", "gpt-4o-mini")
+    stats = RouterStats()
+
+    def cliente_falso(consulta: str) -> Callable[[str], Awaitable[str]]:
+        async def run(deployment: str) -> str:
+            # El modelo rápido "olvida" citar cuando preguntan por costos, para forzar el escalamiento.
+            if deployment == fast_deployment():
+                await asyncio.sleep(0.05)
+                if "costos" in consulta:
+                    return "Los costos fueron $850 M."
+                return "Ingresos Q3: $1,200 M [doc_1†Reporte_Q3_2025.pdf]"
+            await asyncio.sleep(0.3)
+            return "Resultado validado [doc_1†Reporte_Q3_2025.pdf]"
+        return run
+
+    consultas = [
+        "¿Cuáles fueron los ingresos del Q3 2025?",
+        "¿Cuáles fueron los costos del tercer trimestre de 2025?",
+        "Compara el EBITDA del Q2 2025 versus el Q3 2025.",
+        "Verifica si ingresos menos costos cuadran con el resultado operativo.",
+    ]
+    for consulta in consultas:
+        _, decision = await ejecutar_con_ruteo(consulta, cliente_falso(consulta), stats=stats)
+        print(f"{decision.tier:>5} | {decision.reason:<35} | escalada={decision.escalated} | {consulta}")
+
+    print(stats.summary())
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from azure.ai.projects.models import (
+    AzureAISearchAgentTool,
+    PromptAgentDefinition,
+    AzureAISearchToolResource,
+    AISearchIndexResource,
+    AzureAISearchQueryType,
+)
+
+from transport import close_shared_transport, get_openai_client, get_project_client, pool_stats
+
+# Variante asíncrona de test.py (agente con Azure AI Search) sobre el transporte HTTP compartido
+load_dotenv()
+
+async def main() -> None:
+    project_client = get_project_client()
+    openai_client = get_openai_client()
+
+    try:
+        agent = await project_client.agents.create_version(
+            agent_name="MyAgent",
+            definition=PromptAgentDefinition(
+                model=os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"],
+                instructions="""You are a helpful assistant. You must always provide citations for
+                answers using the tool and render them as: `[message_idx:search_idx†source]`.""",
+                tools=[
+                    AzureAISearchAgentTool(
+                        azure_ai_search=AzureAISearchToolResource(
+                            indexes=[
+                                AISearchIndexResource(
+                                    project_connection_id=os.environ["AI_SEARCH_PROJECT_CONNECTION_ID"],
+                                    index_name=os.environ["AI_SEARCH_INDEX_NAME"],
+                                    query_type=AzureAISearchQueryType.SIMPLE,
+                                ),
+                            ]
+                        )
+                    )
+                ],
+            ),
+            description="You are a helpful agent.",
+        )
+        print(f"Agent created (id: {agent.id}, name: {agent.name}, version: {agent.version})")
+
+        user_input = input(
+            """Enter your question for the AI Search agent available in the index
+            (e.g., 'Tell me about the mental health services available from Premera'): \n"""
+        )
+
+        stream_response = await openai_client.responses.create(
+            stream=True,
+            tool_choice="required",
+            input=user_input,
+            extra_body={"agent": {"name": agent.name, "type": "agent_reference"}},
+        )
+
+        async for event in stream_response:
+            if event.type == "response.created":
+                print(f"Follow-up response created with ID: {event.response.id}")
+            elif event.type == "response.output_text.delta":
+                print(f"Delta: {event.delta}")
+            elif event.type == "response.output_item.done":
+                if event.item.type == "message":
+                    item = event.item
+                    if item.content[-1].type == "output_text":
+                        text_content = item.content[-1]
+                        for annotation in text_content.annotations:
+                            if annotation.type == "url_citation":
+                                print(
+                                    f"URL Citation: {annotation.url}, "
+                                    f"Start index: {annotation.start_index}, "
+                                    f"End index: {annotation.end_index}"
+                                )
+            elif event.type == "response.completed":
+                print(f"\nFollow-up completed!")
+                print(f"Full response: {event.response.output_text}")
+
+        print("\nCleaning up...")
+        await project_client.agents.delete_version(agent_name=agent.name, agent_version=agent.version)
+        print("Agent deleted")
+        print(f"[POOL] {pool_stats()}")
+    finally:
+        await close_shared_transport()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -15,6 +15,8 @@ from agent_framework import HostedCodeInterpreterTool
 from azure.identity import DefaultAzureCredential, AzureCliCredential
 from dotenv import load_dotenv
 
+from cassette import Cassette, cassette_scope, cliente_chat, grabar_tool
+
 load_dotenv()
 
 # --- CONFIGURACIÓN ---
@@ -22,6 +24,8 @@ load_dotenv()
 ENDPOINT = os.environ.get("AZURE_OPENAI_ENDPOINT")
 DEPLOYMENT = os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")
 
+USER_QUERY = "Dime la información financiera del Q3 2025 y verifica si los costos e ingresos cuadran con el resultado."
+
 # =============================================================================
 # 1. DEFINICIÓN DE HERRAMIENTAS (TOOLS)
 # =============================================================================
@@ -29,6 +33,7 @@ DEPLOYMENT = os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")
 # En MAF, definimos la búsqueda como una @ai_function para tipado seguro
 # y fácil integración con el agente[cite: 4061].
 @ai_function
+@grabar_tool  # Grabable en cassettes para benchmarks deterministas
 async def search_tecpetrol_docs(query: str) -> str:
     """
     Busca información financiera y operativa en los documentos indexados de Tecpetrol.
@@ -55,17 +60,8 @@ async def search_tecpetrol_docs(query: str) -> str:
 # 2. CONFIGURACIÓN DEL FLUJO DE TRABAJO
 # =============================================================================
 
-async def main():
-    print("=== INICIANDO WORKFLOW SECUENCIAL: EXTRACTOR -> AUDITOR ===\n")
-
-    # Inicialización del cliente de modelo (Azure OpenAI)
-    # Usamos DefaultAzureCredential para autenticación segura y sin llaves
-    client = AzureOpenAIChatClient(
-        model_id=DEPLOYMENT,
-        azure_endpoint=ENDPOINT,
-        credential=AzureCliCredential() # O DefaultAzureCredential()
-    )
-
+def construir_workflow(client):
+    """Arma el pipeline Extractor -> Auditor sobre el cliente de chat recibido."""
     # --- AGENTE 1: EL EXTRACTOR ---
     # Este agente solo tiene la herramienta de búsqueda.
     extractor_agent = ChatAgent(
@@ -96,32 +92,49 @@ async def main():
     # --- CONSTRUCCIÓN DEL WORKFLOW ---
     # Usamos SequentialBuilder para encadenar los agentes.
     # El flujo es: Usuario -> Extractor (Busca) -> Auditor (Verifica) -> Salida Final.
-    workflow = (
+    return (
         SequentialBuilder()
         .participants([extractor_agent, auditor_agent])
         .build()
     )
 
+async def main():
+    print("=== INICIANDO WORKFLOW SECUENCIAL: EXTRACTOR -> AUDITOR ===\n")
+
+    # Inicialización del cliente de modelo (Azure OpenAI)
+    # Usamos DefaultAzureCredential para autenticación segura y sin llaves
+    # Con CASSETTE_MODE=record|replay el cliente se graba o se reproduce offline
+    cassette = Cassette.desde_entorno("sequencial")
+    client = cliente_chat(cassette, lambda: AzureOpenAIChatClient(
+        model_id=DEPLOYMENT,
+        azure_endpoint=ENDPOINT,
+        credential=AzureCliCredential() # O DefaultAzureCredential()
+    ))
+
+    workflow = construir_workflow(client)
+
     # =========================================================================
     # 3. EJECUCIÓN
     # =========================================================================
     
-    user_query = "Dime la información financiera del Q3 2025 y verifica si los costos e ingresos cuadran con el resultado."
-    
-    print(f"Usuario: {user_query}\n")
+    print(f"Usuario: {USER_QUERY}\n")
 
     # Ejecución en streaming para observar el pensamiento de los agentes
-    async for event in workflow.run_stream(user_query):
-        
-        # Capturamos la salida parcial de los agentes (Pensamiento/Tokens)
-        if isinstance(event, AgentRunUpdateEvent):
-            # Imprimimos el nombre del agente y el contenido generado
-            if event.data.text:
-                print(f"[{event.source}]: {event.data.text}", end="", flush=True)
-        
-        # Capturamos la salida final del workflow
-        elif isinstance(event, WorkflowOutputEvent):
-            print(f"\n\n[WORKFLOW FINALIZADO]:\n{event.data}")
+    with cassette_scope(cassette):
+        async for event in workflow.run_stream(USER_QUERY):
+            
+            # Capturamos la salida parcial de los agentes (Pensamiento/Tokens)
+            if isinstance(event, AgentRunUpdateEvent):
+                # Imprimimos el nombre del agente y el contenido generado
+                if event.data.text:
+                    print(f"[{event.source}]: {event.data.text}", end="", flush=True)
+            
+            # Capturamos la salida final del workflow
+            elif isinstance(event, WorkflowOutputEvent):
+                print(f"\n\n[WORKFLOW FINALIZADO]:\n{event.data}")
+
+    if cassette is not None:
+        cassette.guardar()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
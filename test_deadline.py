@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+import deadline as deadline_mod
+from deadline import Deadline, current_deadline, deadline_scope
+
+
+def _estados(deadline: Deadline) -> dict:
+    return {etapa.name: etapa.status for etapa in deadline.stages}
+
+
+def test_from_timeout_acota_al_maximo(monkeypatch):
+    monkeypatch.setattr(deadline_mod, "MAX_TIMEOUT_S", 10.0)
+    deadline = Deadline.from_timeout(1000)
+    assert deadline.expires_at - deadline.started_at == pytest.approx(10.0)
+
+
+def test_from_timeout_usa_el_presupuesto_por_defecto(monkeypatch):
+    monkeypatch.setattr(deadline_mod, "DEFAULT_TIMEOUT_S", 7.0)
+    deadline = Deadline.from_timeout()
+    assert deadline.expires_at - deadline.started_at == pytest.approx(7.0)
+
+
+def test_etapa_ok_devuelve_resultado():
+    async def _etapa():
+        return "listo"
+
+    async def _correr():
+        deadline = Deadline.from_timeout(5)
+        return deadline, await deadline.run_stage("etapa", _etapa())
+
+    deadline, resultado = asyncio.run(_correr())
+    assert resultado == "listo"
+    assert _estados(deadline) == {"etapa": "ok"}
+
+
+def test_etapa_sin_presupuesto_se_omite():
+    llamada = []
+
+    async def _etapa():
+        llamada.append(True)
+        return "no debería ejecutarse"
+
+    async def _correr():
+        deadline = Deadline.from_timeout(1)
+        # La reserva consume todo el presupuesto: la etapa ni siquiera arranca.
+        return deadline, await deadline.run_stage("etapa", _etapa(), reserve_s=5, fallback="respaldo")
+
+    deadline, resultado = asyncio.run(_correr())
+    assert resultado == "respaldo"
+    assert llamada == []
+    assert _estados(deadline) == {"etapa": "skipped"}
+    assert deadline.stages[0].budget_s == 0.0
+
+
+def test_etapa_que_excede_el_presupuesto_se_cancela():
+    async def _correr():
+        deadline = Deadline.from_timeout(0.05)
+        return deadline, await deadline.run_stage("lenta", asyncio.sleep(1), fallback="respaldo")
+
+    deadline, resultado = asyncio.run(_correr())
+    assert resultado == "respaldo"
+    assert _estados(deadline) == {"lenta": "cancelled"}
+
+
+def test_cancelacion_anidada():
+    # La primera etapa interna reserva más que la externa: se corta primero y devuelve su respaldo.
+    # La segunda no reserva nada, así que la externa vence antes y la cancela desde afuera:
+    # ambas deben quedar como 'cancelled' y la externa devuelve su respaldo.
+    async def _interna_que_respeta_la_reserva(deadline: Deadline):
+        resultado = await deadline.run_stage(
+            "interna", asyncio.sleep(1), reserve_s=0.2, fallback="respaldo interno"
+        )
+        assert resultado == "respaldo interno"
+        await deadline.run_stage("interna_2", asyncio.sleep(1))
+
+    async def _correr():
+        deadline = Deadline.from_timeout(0.3)
+        resultado = await deadline.run_stage(
+            "externa", _interna_que_respeta_la_reserva(deadline), reserve_s=0.1, fallback="respaldo externo"
+        )
+        return deadline, resultado
+
+    deadline, resultado = asyncio.run(_correr())
+    assert resultado == "respaldo externo"
+    assert _estados(deadline) == {"externa": "cancelled", "interna": "cancelled", "interna_2": "cancelled"}
+
+
+def test_cancelacion_externa_se_propaga():
+    async def _correr():
+        deadline = Deadline.from_timeout(5)
+        tarea = asyncio.create_task(deadline.run_stage("etapa", asyncio.sleep(1)))
+        await asyncio.sleep(0.01)
+        tarea.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea
+        return deadline
+
+    deadline = asyncio.run(_correr())
+    assert _estados(deadline) == {"etapa": "cancelled"}
+
+
+def test_error_en_la_etapa_se_registra_y_propaga():
+    async def _falla():
+        raise ValueError("falló")
+
+    async def _correr():
+        deadline = Deadline.from_timeout(5)
+        with pytest.raises(ValueError):
+            await deadline.run_stage("etapa", _falla())
+        return deadline
+
+    deadline = asyncio.run(_correr())
+    assert _estados(deadline) == {"etapa": "error"}
+
+
+def test_deadline_scope_publica_y_restaura():
+    deadline = Deadline.from_timeout(5)
+    assert current_deadline() is None
+    with deadline_scope(deadline):
+        assert current_deadline() is deadline
+    assert current_deadline() is None
+
+
+def test_add_partial_ignora_textos_vacios():
+    deadline = Deadline.from_timeout(5)
+    deadline.add_partial("extractor", "")
+    deadline.add_partial("extractor", "Ingresos [doc_1†Reporte.pdf]")
+    assert deadline.partials == [("extractor", "Ingresos [doc_1†Reporte.pdf]")]
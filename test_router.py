@@ -0,0 +1,205 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+import pytest
+
+from deadline import Deadline, deadline_scope
+from router import (
+    COSTO_RELATIVO,
+    TIEMPO_AGOTADO,
+    TIER_FAST,
+    TIER_LARGE,
+    RouterStats,
+    clasificar,
+    ejecutar_con_ruteo,
+    validar_respuesta,
+)
+
+FAST = "gpt-4o-mini"
+LARGE = "gpt-4o"
+CITADA = "Ingresos Q3: $1,200 M [doc_1†Reporte_Q3_2025.pdf]"
+
+
+@pytest.fixture(autouse=True)
+def deployments(monkeypatch):
+    monkeypatch.setenv("AZURE_AI_MODEL_DEPLOYMENT_NAME", LARGE)
+    monkeypatch.setenv("AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME", FAST)
+
+
+def cliente_falso(
+    respuestas: dict, llamadas: List[str], demora_s: float = 0.0
+) -> Callable[[str], Awaitable[Optional[str]]]:
+    """`run(deployment)` falso: devuelve la respuesta configurada para cada deployment."""
+    async def run(deployment: str) -> Optional[str]:
+        llamadas.append(deployment)
+        if demora_s:
+            await asyncio.sleep(demora_s)
+        return respuestas[deployment]
+    return run
+
+# =============================================================================
+# CLASIFICADOR
+# =============================================================================
+
+@pytest.mark.parametrize("query", [
+    "¿Cuáles fueron los ingresos del Q3 2025?",
+    "¿Cuál fue el EBITDA del tercer trimestre de 2025?",
+])
+def test_clasificar_un_periodo_va_al_rapido(query):
+    decision = clasificar(query)
+    assert (decision.tier, decision.deployment) == (TIER_FAST, FAST)
+    assert decision.features["periodos"] == 1
+
+
+@pytest.mark.parametrize("query", [
+    "Ingresos del Q2 y Q3 2025",
+    "Ingresos de 2024 y 2025",
+])
+def test_clasificar_varios_periodos_va_al_grande(query):
+    decision = clasificar(query)
+    assert (decision.tier, decision.deployment) == (TIER_LARGE, LARGE)
+    assert decision.reason == "varios periodos"
+
+
+def test_clasificar_comparacion_va_al_grande():
+    decision = clasificar("Compara el EBITDA del Q2 2025 versus el Q3 2025.")
+    assert decision.tier == TIER_LARGE
+    assert decision.reason == "comparación"
+
+
+def test_clasificar_auditoria_va_al_grande():
+    decision = clasificar("Verifica si ingresos menos costos cuadran con el resultado operativo.")
+    assert decision.tier == TIER_LARGE
+    assert decision.reason == "solicitud de auditoría/verificación"
+
+
+def test_clasificar_sin_deployment_rapido(monkeypatch):
+    monkeypatch.delenv("AZURE_AI_FAST_MODEL_DEPLOYMENT_NAME")
+    decision = clasificar("¿Cuáles fueron los ingresos del Q3 2025?")
+    assert (decision.tier, decision.deployment) == (TIER_LARGE, LARGE)
+
+
+def test_clasificar_forzado():
+    assert clasificar("Compara Q2 vs Q3", force_tier=TIER_FAST).deployment == FAST
+    assert clasificar("Ingresos Q3", force_tier=TIER_LARGE).deployment == LARGE
+
+# =============================================================================
+# VALIDACIÓN
+# =============================================================================
+
+@pytest.mark.parametrize("texto, valida", [
+    (CITADA, True),
+    ("Los costos fueron $850 M.", False),
+    ("No encontré información sobre ese periodo en los documentos.", True),
+    ("", False),
+    ("   ", False),
+    (None, False),
+    (f"{TIEMPO_AGOTADO} El Extractor no terminó.", False),
+])
+def test_validar_respuesta(texto, valida):
+    assert validar_respuesta(texto) is valida
+
+# =============================================================================
+# EJECUCIÓN CON RUTEO Y ESCALAMIENTO
+# =============================================================================
+
+def test_respuesta_rapida_valida_no_escala():
+    llamadas: List[str] = []
+    stats = RouterStats()
+    texto, decision = asyncio.run(
+        ejecutar_con_ruteo("Ingresos Q3 2025", cliente_falso({FAST: CITADA}, llamadas), stats=stats)
+    )
+    assert texto == CITADA
+    assert llamadas == [FAST]
+    assert not decision.escalated
+    assert stats.consultas == {TIER_FAST: 1, TIER_LARGE: 0}
+
+
+def test_sin_cita_escala_al_grande():
+    llamadas: List[str] = []
+    stats = RouterStats()
+    respuestas = {FAST: "Los costos fueron $850 M.", LARGE: CITADA}
+    texto, decision = asyncio.run(
+        ejecutar_con_ruteo("Costos Q3 2025", cliente_falso(respuestas, llamadas), stats=stats)
+    )
+    assert texto == CITADA
+    assert llamadas == [FAST, LARGE]
+    assert decision.escalated
+    assert stats.consultas == {TIER_FAST: 1, TIER_LARGE: 1}
+    assert stats.escalamientos == 1
+
+
+@pytest.mark.parametrize("agotada", [None, f"{TIEMPO_AGOTADO} El Extractor no terminó."])
+def test_tiempo_agotado_no_escala_ni_registra(agotada):
+    llamadas: List[str] = []
+    stats = RouterStats()
+    texto, decision = asyncio.run(
+        ejecutar_con_ruteo("Ingresos Q3 2025", cliente_falso({FAST: agotada}, llamadas), stats=stats)
+    )
+    assert texto == agotada
+    assert llamadas == [FAST]
+    assert not decision.escalated
+    assert stats.consultas == {TIER_FAST: 0, TIER_LARGE: 0}
+
+
+def test_deadline_vencido_no_escala():
+    llamadas: List[str] = []
+    stats = RouterStats()
+    run = cliente_falso({FAST: "Sin citas.", LARGE: CITADA}, llamadas, demora_s=0.05)
+
+    async def _correr():
+        deadline = Deadline.from_timeout(0.01)
+        with deadline_scope(deadline):
+            return await ejecutar_con_ruteo("Ingresos Q3 2025", run, stats=stats)
+
+    texto, decision = asyncio.run(_correr())
+    assert texto == "Sin citas."
+    assert llamadas == [FAST]
+    assert not decision.escalated
+    assert stats.escalamientos == 0
+
+
+def test_escalamiento_agotado_conserva_la_respuesta_rapida():
+    llamadas: List[str] = []
+    stats = RouterStats()
+    respuestas = {FAST: "Los costos fueron $850 M.", LARGE: f"{TIEMPO_AGOTADO} El Extractor no terminó."}
+    texto, decision = asyncio.run(
+        ejecutar_con_ruteo("Costos Q3 2025", cliente_falso(respuestas, llamadas), stats=stats)
+    )
+    assert texto == "Los costos fueron $850 M."
+    assert llamadas == [FAST, LARGE]
+    assert not decision.escalated
+    assert stats.consultas == {TIER_FAST: 1, TIER_LARGE: 0}
+    assert stats.escalamientos == 0
+
+# =============================================================================
+# ESTADÍSTICAS
+# =============================================================================
+
+def test_router_stats_summary():
+    stats = RouterStats()
+    # Tres consultas: una rápida resuelta, una rápida escalada y una directa al grande.
+    stats.registrar(TIER_FAST, 0.1)
+    stats.registrar(TIER_FAST, 0.1)
+    stats.registrar(TIER_LARGE, 1.0)
+    stats.escalamientos += 1
+    stats.registrar(TIER_LARGE, 1.0)
+
+    resumen = stats.summary()
+    assert resumen["consultas"] == 3
+    assert resumen["llamadas_por_tier"] == {TIER_FAST: 2, TIER_LARGE: 2}
+    assert resumen["latencia_promedio_s"] == {TIER_FAST: 0.1, TIER_LARGE: 1.0}
+    assert resumen["escalamientos"] == 1
+    assert resumen["tasa_escalamiento"] == 0.5
+    costo = 2 * COSTO_RELATIVO[TIER_FAST] + 2 * COSTO_RELATIVO[TIER_LARGE]
+    assert resumen["costo_relativo"] == pytest.approx(costo)
+    assert resumen["ahorro_costo_relativo"] == pytest.approx(3 * COSTO_RELATIVO[TIER_LARGE] - costo)
+    # Una consulta resuelta por el rápido ahorra 1.0 s, menos los 0.2 s gastados en el rápido.
+    assert resumen["ahorro_latencia_estimado_s"] == pytest.approx(0.8)
+
+
+def test_router_stats_summary_vacio():
+    resumen = RouterStats().summary()
+    assert resumen["consultas"] == 0
+    assert resumen["tasa_escalamiento"] == 0.0
+    assert resumen["ahorro_latencia_estimado_s"] is None
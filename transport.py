@@ -0,0 +1,271 @@
+"""
+Transporte HTTP asíncrono compartido (pool de conexiones) para todos los clientes de Azure.
+
+Antes cada request de `/ask` y cada tool del orquestador creaba su propio cliente y, con él,
+un pool nuevo: cada llamada pagaba TCP + TLS. Aquí se mantiene un único pool por proceso:
+- Clientes del SDK de Azure (proyecto, credencial): aiohttp con keep-alive.
+- Cliente OpenAI: httpx con HTTP/2 (si `h2` está instalado), también con keep-alive. Todos los
+  `AzureAIClient` creados con `get_azure_ai_client()` comparten el mismo `AsyncOpenAI`, así que
+  el tráfico al modelo de `/ask` y de las tools también pasa por este pool.
+
+`pool_stats()` reporta requests, conexiones abiertas, handshakes TLS y tasa de reutilización.
+"""
+
+import os
+import ssl
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import aiohttp
+import httpx
+from azure.ai.projects.aio import AIProjectClient
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
+from agent_framework.azure import AzureAIClient
+from openai import AsyncOpenAI
+
+# =============================================================================
+# CONFIGURACIÓN DEL POOL
+# =============================================================================
+
+MAX_CONNECTIONS = int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", "100"))
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_POOL_MAX_PER_HOST", "20"))
+# httpx no tiene límite por host: este es el tope TOTAL de conexiones ociosas del pool de OpenAI
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_POOL_MAX_KEEPALIVE", "20"))
+KEEPALIVE_S = float(os.environ.get("HTTP_KEEPALIVE_S", "30"))
+
+try:
+    import h2  # noqa: F401  (habilita HTTP/2 en httpx)
+    HTTP2_DISPONIBLE = True
+except ImportError:
+    HTTP2_DISPONIBLE = False
+
+
+@dataclass
+class PoolStats:
+    """Contadores de uso del pool (por transporte)."""
+    requests: int = 0
+    conexiones_nuevas: int = 0
+    handshakes_tls: int = 0
+
+    @property
+    def conexiones_reutilizadas(self) -> int:
+        return max(0, self.requests - self.conexiones_nuevas)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "conexiones_nuevas": self.conexiones_nuevas,
+            "handshakes_tls": self.handshakes_tls,
+            "conexiones_reutilizadas": self.conexiones_reutilizadas,
+            "tasa_reutilizacion": round(self.conexiones_reutilizadas / self.requests, 3) if self.requests else 0.0,
+        }
+
+    def aiohttp_trace_config(self) -> aiohttp.TraceConfig:
+        """Hooks de aiohttp que cuentan requests y conexiones nuevas."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def _on_request_start(session, ctx, params):
+            self.requests += 1
+
+        async def _on_connection_create_end(session, ctx, params):
+            self.conexiones_nuevas += 1
+            # Todos los endpoints de Azure son HTTPS: conexión nueva = handshake TLS
+            self.handshakes_tls += 1
+
+        trace_config.on_request_start.append(_on_request_start)
+        trace_config.on_connection_create_end.append(_on_connection_create_end)
+        return trace_config
+
+    def httpx_event_hooks(self) -> Dict[str, list]:
+        """Hooks de httpx; los eventos de conexión llegan por la extensión `trace` de httpcore."""
+
+        async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                self.conexiones_nuevas += 1
+            elif event_name == "connection.start_tls.complete":
+                self.handshakes_tls += 1
+
+        async def _on_request(request: httpx.Request) -> None:
+            self.requests += 1
+            request.extensions["trace"] = _trace
+
+        return {"request": [_on_request]}
+
+# =============================================================================
+# TRANSPORTE COMPARTIDO
+# =============================================================================
+
+class SharedTransport:
+    """
+    Pool único de conexiones. Las sesiones se crean de forma perezosa (necesitan un event loop)
+    y se cierran una sola vez con `aclose()` al terminar el proceso.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_s: float = KEEPALIVE_S,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_s = keepalive_s
+        self.ssl_context = ssl_context
+        self.azure_stats = PoolStats()
+        self.openai_stats = PoolStats()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_s,
+                ssl=self.ssl_context if self.ssl_context is not None else True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self.azure_stats.aiohttp_trace_config()],
+            )
+        return self._session
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                http2=HTTP2_DISPONIBLE,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_s,
+                ),
+                verify=self.ssl_context if self.ssl_context is not None else True,
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                event_hooks=self.openai_stats.httpx_event_hooks(),
+            )
+        return self._http_client
+
+    def azure_transport(self) -> AioHttpTransport:
+        """Transporte para clientes del SDK de Azure. No cierra la sesión compartida al cerrarse."""
+        return AioHttpTransport(session=self.session, session_owner=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "azure": self.azure_stats.summary(),
+            "openai": self.openai_stats.summary(),
+            "http2": HTTP2_DISPONIBLE,
+        }
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        if self._session is not None:
+            await self._session.close()
+        self._http_client = None
+        self._session = None
+
+    async def __aenter__(self) -> "SharedTransport":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+# =============================================================================
+# CLIENTES COMPARTIDOS (uno por proceso)
+# =============================================================================
+
+# Mismos valores que usa `AIProjectClient.get_openai_client()` en azure-ai-projects 2.0.0b2/b3
+OPENAI_API_VERSION = "2025-11-15-preview"
+OPENAI_TOKEN_SCOPE = "https://ai.azure.com/.default"
+
+
+class _ProjectClientCompartido(AIProjectClient):
+    """
+    `AIProjectClient` cuyo `get_openai_client()` sin argumentos devuelve el `AsyncOpenAI` compartido.
+    `AzureAIClient` lo llama así al inicializarse: sin esto, cada `AzureAIClient` armaba su propio
+    `AsyncOpenAI` con un pool httpx nuevo. (El SDK fija `http_client=None` y no acepta otro, por eso
+    el cliente compartido se construye en `get_openai_client()` de este módulo.)
+    """
+
+    def get_openai_client(self, **kwargs: Any) -> AsyncOpenAI:
+        if kwargs:
+            return super().get_openai_client(**kwargs)
+        return get_openai_client()
+
+
+_transport: Optional[SharedTransport] = None
+_credential: Optional[DefaultAzureCredential] = None
+_project_client: Optional[AIProjectClient] = None
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def get_shared_transport() -> SharedTransport:
+    global _transport
+    if _transport is None:
+        _transport = SharedTransport()
+    return _transport
+
+
+def get_credential() -> DefaultAzureCredential:
+    """Credencial compartida: reutiliza el pool y la caché de tokens entre requests."""
+    global _credential
+    if _credential is None:
+        _credential = DefaultAzureCredential(transport=get_shared_transport().azure_transport())
+    return _credential
+
+
+def get_project_client() -> AIProjectClient:
+    """Cliente de proyecto de Azure AI Foundry (async) sobre el pool compartido."""
+    global _project_client
+    if _project_client is None:
+        _project_client = _ProjectClientCompartido(
+            endpoint=os.environ["AZURE_AI_PROJECT_ENDPOINT"],
+            credential=get_credential(),
+            transport=get_shared_transport().azure_transport(),
+        )
+    return _project_client
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Cliente OpenAI (async) del proyecto, usando el cliente httpx compartido."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(
+            base_url=os.environ["AZURE_AI_PROJECT_ENDPOINT"].rstrip("/") + "/openai",
+            api_key=get_bearer_token_provider(get_credential(), OPENAI_TOKEN_SCOPE),
+            default_query={"api-version": OPENAI_API_VERSION},
+            http_client=get_shared_transport().http_client,
+        )
+    return _openai_client
+
+
+def get_azure_ai_client() -> AzureAIClient:
+    """
+    `AzureAIClient` sobre el proyecto y el `AsyncOpenAI` compartidos. Crearlo es barato
+    (no abre conexiones), así que se crea uno por agente y no se comparte su estado.
+    """
+    return AzureAIClient(project_client=get_project_client())
+
+
+def pool_stats() -> Dict[str, Any]:
+    return get_shared_transport().stats()
+
+
+async def close_shared_transport() -> None:
+    """Cierra clientes, credencial y pool compartidos (al apagar la app o terminar el CLI)."""
+    global _transport, _credential, _project_client, _openai_client
+    if _project_client is not None:
+        await _project_client.close()
+    if _credential is not None:
+        await _credential.close()
+    if _transport is not None:
+        await _transport.aclose()
+    # El AsyncOpenAI no tiene pool propio (usa el httpx del transporte, ya cerrado)
+    _transport = _credential = _project_client = _openai_client = None